@@ -0,0 +1,159 @@
+"""aioftp 기반 비동기 재귀 디렉토리 순회 (선택 기능 모듈)
+
+이 작업은 거의 전부 네트워크 왕복 대기이므로, asyncio는 스레드 풀보다
+훨씬 적은 오버헤드로 수십~수백 개의 목록 요청을 동시에 띄울 수 있습니다.
+기본 스레드 기반 경로(main.py)는 표준 라이브러리만 쓰므로 이 모듈은
+선택 의존성으로 분리되어 있습니다:
+
+    pip install ftp-scout[async]
+
+FTP 연결 하나는 한 번에 한 명령만 처리할 수 있으므로 동시성 수만큼의
+클라이언트 풀을 만들고, 세마포어로 동시에 진행 중인 목록 요청 수를
+제한합니다.
+"""
+
+import asyncio
+from typing import AsyncGenerator, Generator, List, Tuple
+
+try:
+    import aioftp
+except ImportError:  # 선택 의존성 - 미설치 시 사용 시점에 안내
+    aioftp = None
+
+from log_utils import logger
+
+DEFAULT_CONCURRENCY = 16
+
+# (디렉토리 표시 경로, 항목 목록) - 스레드 버전의 DirListing과 같은 구조
+AsyncDirListing = Tuple[str, List[Tuple[str, bool]]]
+
+
+async def _list_directory(client, path: str) -> List[Tuple[str, bool]]:
+    """한 디렉토리의 (이름, is_dir) 목록을 가져옵니다."""
+    entries: List[Tuple[str, bool]] = []
+    async for item_path, facts in client.list(path):
+        entry_type = facts.get("type", "file")
+        if entry_type == "cdir" or entry_type == "pdir":
+            continue  # "."/".." 대응 항목
+        entries.append((item_path.name, entry_type == "dir"))
+    return entries
+
+
+async def walk_async(
+    host: str,
+    username: str,
+    password: str,
+    remote_start_path: str = "/",
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> AsyncGenerator[Tuple[str, bool], None]:
+    """FTP 트리를 비동기로 순회하며 (표시 경로, is_dir)를 생성합니다.
+
+    하위 디렉토리마다 태스크를 만들되 세마포어로 동시 목록 요청 수를
+    제한하고, 클라이언트 풀에서 유휴 연결을 빌려 씁니다. 미해결 디렉토리
+    카운터가 0이 되면 센티널로 소비 루프를 끝냅니다.
+    """
+    if aioftp is None:
+        raise ImportError(
+            "비동기 순회에는 aioftp가 필요합니다: pip install ftp-scout[async]"
+        )
+
+    normalized_start = remote_start_path.rstrip("/") or "/"
+    prefix = "" if normalized_start == "/" else normalized_start
+
+    # 동시성 수만큼 클라이언트를 연결해 풀에 넣습니다
+    pool: "asyncio.Queue" = asyncio.Queue()
+    clients = []
+    tasks: set = set()
+    try:
+        for _ in range(max(1, concurrency)):
+            client = aioftp.Client()
+            await client.connect(host)
+            await client.login(username, password)
+            clients.append(client)
+            pool.put_nowait(client)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        results: "asyncio.Queue" = asyncio.Queue(maxsize=max(1, concurrency) * 2)
+        outstanding = [1]  # 시작 디렉토리 1건
+
+        async def visit(path: str, relative: str) -> None:
+            entries = None
+            async with semaphore:
+                client = await pool.get()
+                try:
+                    entries = await _list_directory(client, path)
+                except Exception as e:
+                    logger.warning("비동기 목록 실패: %s - %s", path, e)
+                finally:
+                    pool.put_nowait(client)
+
+            if entries:
+                await results.put((relative, entries))
+                for name, is_dir in entries:
+                    if is_dir:
+                        outstanding[0] += 1
+                        child_path = f"{path}/{name}" if path != "/" else f"/{name}"
+                        child_rel = f"{relative}{name}/"
+                        task = asyncio.create_task(visit(child_path, child_rel))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+
+            outstanding[0] -= 1
+            if outstanding[0] == 0:
+                await results.put(None)  # 순회 완료 센티널
+
+        root_task = asyncio.create_task(visit(normalized_start, ""))
+        tasks.add(root_task)
+        root_task.add_done_callback(tasks.discard)
+
+        while True:
+            listing = await results.get()
+            if listing is None:
+                break
+            relative, entries = listing
+            base_path = f"{prefix}/{relative}"
+            for name, is_dir in entries:
+                if is_dir:
+                    yield f"{base_path}{name}/", True
+                else:
+                    yield f"{base_path}{name}", False
+    finally:
+        # 소비자가 제너레이터를 중간에 버리면(aclose) visit 태스크들이
+        # 대기 중으로 남습니다. 취소하고 끝나기를 기다린 뒤에 연결을
+        # 닫아야 "Task was destroyed but it is pending!" 경고와 닫힌
+        # 루프에서의 뒷정리 오류가 생기지 않습니다.
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for client in clients:
+            try:
+                await client.quit()
+            except Exception:
+                pass
+
+
+def generate_ftp_recursive_listing_async(
+    host: str,
+    username: str,
+    password: str,
+    remote_start_path: str = "/",
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Generator[Tuple[str, bool], None, None]:
+    """walk_async를 동기 코드에서 쓰기 위한 제너레이터 래퍼
+
+    이벤트 루프를 직접 돌리며 비동기 제너레이터를 한 항목씩 꺼내므로
+    결과를 전부 모으지 않고 스트리밍 그대로 전달합니다.
+    """
+    agen = walk_async(host, username, password, remote_start_path, concurrency)
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+# 환경 변수 FTPSCOUT_CACHE_TTL (초)로 TTL을 조정할 수 있습니다.
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL_SECONDS = 3600.0
+
+CacheKey = Tuple[str, str]  # (호스트, 정규화된 경로)
+Listing = List[Tuple[str, bool]]
+
+
+class DirectoryListingCache:
+    """디렉토리 목록을 위한 인메모리 LRU+TTL 캐시
+
+    같은 트리를 반복해서 걷는 경우(재실행, 끊김 후 재개) 서버 왕복 없이
+    캐시된 목록을 재사용합니다. 항목 수 상한을 넘으면 가장 오래 사용되지
+    않은 항목부터 제거합니다.
+    """
+
+    def __init__(
+        self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: Optional[float] = None
+    ) -> None:
+        """
+        Args:
+            max_entries: 보관할 최대 디렉토리 수
+            ttl: 항목 유효 시간(초). None이면 FTPSCOUT_CACHE_TTL 환경 변수
+                 또는 기본값(1시간)을 사용합니다.
+        """
+        if ttl is None:
+            ttl = float(os.environ.get("FTPSCOUT_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Listing]]" = OrderedDict()
+        # 병렬 순회 워커들이 같은 캐시를 공유하므로 내부 상태를 잠금으로 보호
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(host: str, path: str) -> CacheKey:
+        return (host, path.rstrip("/") + "/")
+
+    def get(self, host: str, path: str) -> Optional[Listing]:
+        """캐시된 목록을 반환합니다. 없거나 만료되었으면 None."""
+        key = self._make_key(host, path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached_at, listing = entry
+            if time.monotonic() - cached_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)  # LRU 갱신
+            return listing
+
+    def put(self, host: str, path: str, listing: Listing) -> None:
+        """목록을 캐시에 저장합니다."""
+        key = self._make_key(host, path)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), listing)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_fetch(
+        self, host: str, path: str, fetch: Callable[[], Optional[Listing]]
+    ) -> Optional[Listing]:
+        """캐시에서 목록을 찾고, 없으면 fetch()로 가져와 저장합니다."""
+        listing = self.get(host, path)
+        if listing is not None:
+            return listing
+        listing = fetch()
+        if listing is not None:
+            self.put(host, path, listing)
+        return listing
+
+    def invalidate(self, host: str, path: str) -> None:
+        """특정 디렉토리의 캐시 항목을 제거합니다."""
+        with self._lock:
+            self._entries.pop(self._make_key(host, path), None)
+
+    def clear(self) -> None:
+        """캐시를 비웁니다."""
+        with self._lock:
+            self._entries.clear()
@@ -1,57 +1,133 @@
+import re
+import socket
+from ftplib import error_temp
 from typing import List, Optional, Tuple
 
 from ftp_strategy import FTPDirectoryStrategy
+from log_utils import logger
 from robust_ftp import RobustFTPConnection
 
+# Unix 스타일 ls -l 한 줄에서 실제로 쓰는 두 필드(종류 문자, 파일명)만
+# 캡처합니다. 권한/링크수/소유자 등 앞 8개 토큰을 분리 저장하지 않으므로
+# split(None, 8) 대비 줄당 할당이 크게 줄어듭니다. re.M 멀티라인 앵커로
+# 전체 목록 버퍼에 finditer를 한 번 적용해 줄 루프를 C 레벨에서 돌립니다.
+# 마지막 그룹이 줄 끝까지 통째로 잡으므로 공백이 든 파일명도 잘리지 않습니다.
+_LS_RE = re.compile(
+    r"^([dlbcps-])\S*\s+\S+\s+\S+\s+\S+\s+\S+\s+\S+\s+\S+\s+\S+\s+(.*)$", re.M
+)
+
+# Windows IIS 형식: "01-23-24  10:00AM  <DIR>  이름" 또는 "... 12345 이름"
+# 날짜로 시작하므로 첫 글자를 숫자로 고정해, 헤더/빈 줄이 그룹 매칭까지
+# 가보지 않고 첫 바이트에서 탈락하게 합니다.
+_IIS_RE = re.compile(r"^\d\S*\s+\S+\s+(<DIR>|\d+)\s+(.*)$", re.M)
+
 
 class DIRStrategy(FTPDirectoryStrategy):
-    """DIR (LIST) 명령어를 사용하여 디렉토리 내용을 가져오는 전략"""
-    
-    def get_directory_contents(self, ftp_conn: RobustFTPConnection) -> Optional[List[Tuple[str, bool]]]:
+    """DIR (LIST) 명령어를 사용하여 디렉토리 내용을 가져오는 전략
+
+    서버의 LIST 형식(Unix ls -l / Windows IIS)은 세션 내내 바뀌지 않으므로
+    첫 번째 유효한 줄에서 형식을 감지해 전용 파서를 고정하고, 이후 줄은
+    형식 판별 분기 없이 해당 파서로만 처리합니다.
+    """
+
+    def __init__(self) -> None:
+        self._parse_fn = None  # 첫 유효 줄에서 감지한 형식별 버퍼 파서
+
+    @staticmethod
+    def _parse_unix_buffer(buffer: str, names: List[str], flags: bytearray) -> None:
+        """Unix ls -l 목록 버퍼 전체를 finditer 한 번으로 파싱합니다."""
+        append_name = names.append
+        append_flag = flags.append
+        for m in _LS_RE.finditer(buffer):
+            kind = m.group(1)
+            filename = m.group(2)
+            # " -> " 표기는 심볼릭 링크('l') 줄에만 나타나므로 그때만 분리합니다
+            if kind == "l":
+                filename = filename.partition(" -> ")[0]
+            if filename == "." or filename == "..":
+                continue
+            append_name(filename)
+            append_flag(1 if kind == "d" else 0)
+
+    @staticmethod
+    def _parse_iis_buffer(buffer: str, names: List[str], flags: bytearray) -> None:
+        """Windows IIS 형식 목록 버퍼 전체를 finditer 한 번으로 파싱합니다."""
+        append_name = names.append
+        append_flag = flags.append
+        for m in _IIS_RE.finditer(buffer):
+            filename = m.group(2)
+            if filename == "." or filename == "..":
+                continue
+            append_name(filename)
+            append_flag(1 if m.group(1) == "<DIR>" else 0)
+
+    def _detect_parser(self, line: str):
+        """첫 글자로 LIST 형식을 판별해 전용 버퍼 파서를 반환합니다."""
+        first = line[0]
+        if first in "d-lbcps":
+            return self._parse_unix_buffer
+        if first.isdigit():
+            return self._parse_iis_buffer
+        return None  # "total ..." 헤더 등 항목이 아닌 줄
+
+    def get_directory_contents_soa(
+        self, ftp_conn: RobustFTPConnection, path: str
+    ) -> Optional[Tuple[List[str], bytearray]]:
         """
-        DIR (LIST) 명령어를 사용하여 디렉토리 내용을 가져옵니다.
+        DIR (LIST) 명령어로 디렉토리 내용을 SoA(Structure-of-Arrays) 형태로
+        가져옵니다. 파일명 리스트와 나란한 is_dir 플래그 열을 따로 반환하므로
+        플래그가 항목당 bool 객체 대신 1바이트만 차지하고, 한 열만 필요한
+        소비자는 튜플을 만들지 않고 바로 순회할 수 있습니다.
+        경로를 인자로 전달하므로 사전 CWD 왕복이 필요 없습니다.
+
+        전체 응답을 하나의 버퍼로 모아 멀티라인 finditer를 한 번 적용하므로
+        줄 수만큼의 파이썬 루프 반복 대신 정규식 엔진이 C 레벨에서
+        목록 전체를 스캔합니다.
 
         Returns:
-            List[Tuple[str, bool]]: (파일명, is_directory) 튜플의 리스트 또는 None (실패시)
+            Tuple[List[str], bytearray]: (파일명 리스트, is_dir 플래그 열) 또는 None (실패시)
         """
         try:
-            contents = []
-            dir_lines = []
-
-            def collect_lines(line):
-                dir_lines.append(line)
-
-            ftp_conn.dir(collect_lines)
-
-            for line in dir_lines:
-                # Unix 스타일 ls -l 출력을 파싱
-                if not line.strip():
-                    continue
-                    
-                # 다양한 FTP 서버 형식 지원을 위한 개선된 파싱
-                parts = line.split(None, 8)  # 최대 8번만 분리
-                if len(parts) < 4:  # 최소한 권한, 링크수, 소유자, 파일명이 있어야 함
-                    continue
-                    
-                permissions = parts[0]
-                is_dir = permissions.startswith("d")
-                
-                # 파일명 추출 - 마지막 부분에서 링크 표시 제거
-                filename = parts[-1]
-                
-                # 심볼릭 링크 처리 (filename -> target 형식)
-                if " -> " in filename:
-                    filename = filename.split(" -> ")[0]
-                
-                if filename in (".", ".."):
-                    continue
-                    
-                contents.append((filename, is_dir))
-
-            return contents
+            dir_lines: List[str] = []
+            ftp_conn.dir(path, dir_lines.append)
+
+            names: List[str] = []
+            is_dir_flags = bytearray()
+
+            if self._parse_fn is None:
+                # 첫 유효 줄에서 서버 형식을 감지해 파서를 고정합니다
+                for line in dir_lines:
+                    if line:
+                        parse = self._detect_parser(line)
+                        if parse is not None:
+                            self._parse_fn = parse
+                            break
+                if self._parse_fn is None:
+                    return names, is_dir_flags  # 항목 없는 (빈/헤더만 있는) 목록
+
+            self._parse_fn("\n".join(dir_lines), names, is_dir_flags)
+
+            return names, is_dir_flags
+        except (EOFError, ConnectionError, socket.timeout, error_temp):
+            # 연결성 오류는 호출자가 재연결 후 한 번 더 시도하도록 전달
+            raise
         except Exception as e:
-            print(f"DIR 방식 실패: {e}")
+            logger.warning("DIR 방식 실패: %s", e)
+            return None
+
+    def get_directory_contents(self, ftp_conn: RobustFTPConnection, path: str) -> Optional[List[Tuple[str, bool]]]:
+        """
+        DIR (LIST) 명령어를 사용하여 디렉토리 내용을 가져옵니다.
+        내부 SoA 결과를 기존 튜플 API로 변환하는 어댑터입니다.
+
+        Returns:
+            List[Tuple[str, bool]]: (파일명, is_directory) 튜플의 리스트 또는 None (실패시)
+        """
+        soa = self.get_directory_contents_soa(ftp_conn, path)
+        if soa is None:
             return None
+        names, is_dir_flags = soa
+        return [(name, bool(flag)) for name, flag in zip(names, is_dir_flags)]
     
     def get_strategy_name(self) -> str:
         """전략 이름을 반환합니다."""
@@ -1,41 +1,164 @@
+import queue
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ftplib import error_perm, error_temp
 from typing import List, Optional, Tuple
 
 from ftp_strategy import FTPDirectoryStrategy
+from log_utils import logger
 from robust_ftp import RobustFTPConnection
 
 
 class FallbackStrategy(FTPDirectoryStrategy):
-    """백업 방식: nlst()와 cwd()를 사용하여 디렉토리 내용을 가져오는 전략"""
-    
-    def get_directory_contents(self, ftp_conn: RobustFTPConnection) -> Optional[List[Tuple[str, bool]]]:
+    """백업 방식: nlst()와 SIZE 명령을 사용하여 디렉토리 내용을 가져오는 전략"""
+
+    def __init__(self, max_workers: int = 4) -> None:
+        """
+        Args:
+            max_workers: SIZE 탐침에 사용할 병렬 연결 수 (1이면 순차 처리)
         """
-        백업 방식: nlst()와 cwd()를 사용하여 디렉토리 내용을 가져옵니다.
-        이 방식은 느리지만 호환성이 좋습니다.
-        
+        self.max_workers = max_workers
+        self._probe_conns: Optional[queue.Queue] = None
+        # 병렬 순회 워커들이 전략 인스턴스를 공유하므로 풀 생성을 직렬화
+        self._pool_lock = threading.Lock()
+
+    def get_directory_contents(self, ftp_conn: RobustFTPConnection, path: str) -> Optional[List[Tuple[str, bool]]]:
+        """
+        백업 방식: nlst()와 SIZE 명령을 사용하여 디렉토리 내용을 가져옵니다.
+        nlst()는 현재 디렉토리 기준으로 동작하므로 이 전략은 사전 CWD가
+        필요합니다 (requires_cwd() 참고).
+        SIZE는 항목당 왕복 1회로 파일/디렉토리를 구분합니다 (파일이면 크기 응답,
+        디렉토리면 550 오류). FTP 제어 연결은 서로 독립적이므로 보조 연결
+        풀 위에서 탐침을 병렬로 실행해 왕복 지연을 겹칩니다. SIZE를
+        지원하지 않는 서버(500/502)에서만 기존 cwd() 탐침 방식으로 내려갑니다.
+
         Returns:
             List[Tuple[str, bool]]: (파일명, is_directory) 튜플의 리스트 또는 None (실패시)
         """
         try:
-            items = ftp_conn.nlst()
-            contents = []
+            items = [item for item in ftp_conn.nlst() if item not in (".", "..")]
+            if not items:
+                return []
+
+            # retrlines 기반인 nlst()가 연결을 TYPE A(ASCII)로 되돌리는데,
+            # 일부 서버는 ASCII 모드의 SIZE를 550으로 거부해 파일이 전부
+            # 디렉토리로 분류됩니다. 탐침 전에 바이너리 모드로 전환합니다.
+            try:
+                ftp_conn.voidcmd("TYPE I")
+            except Exception:
+                pass  # TYPE 실패 시 _probe_size의 ASCII 거부 감지가 대신 처리
 
-            for item in items:
-                if item in (".", ".."):
-                    continue
-                try:
-                    # 디렉토리인지 확인
-                    ftp_conn.cwd(item)
-                    contents.append((item, True))  # 디렉토리
-                    ftp_conn.cwd("..")
-                except Exception:
-                    contents.append((item, False))  # 파일
+            base_path = path.rstrip("/") or "/"
+            if self.max_workers > 1 and len(items) > 1:
+                results = self._probe_parallel(ftp_conn, base_path, items)
+            else:
+                results = [self._probe_size(ftp_conn, item) for item in items]
+
+            contents = []
+            for item, is_dir in zip(items, results):
+                if is_dir is None:
+                    # 차선책: cwd 탐침. 상대 ".." 대신 절대 경로로 한 번에 복귀합니다.
+                    try:
+                        ftp_conn.cwd(item)
+                        is_dir = True
+                        ftp_conn.cwd(base_path)
+                    except Exception:
+                        is_dir = False
+                contents.append((item, is_dir))
 
             return contents
+        except (EOFError, ConnectionError, socket.timeout, error_temp):
+            # 연결성 오류는 호출자가 재연결 후 한 번 더 시도하도록 전달
+            raise
         except Exception as e:
-            print(f"백업 방식 실패: {e}")
+            logger.warning("백업 방식 실패: %s", e)
             return None
-    
+
+    def _probe_size(self, conn: RobustFTPConnection, path: str) -> Optional[bool]:
+        """SIZE 명령으로 디렉토리 여부를 판별합니다. SIZE 미지원 서버면 None."""
+        try:
+            conn.voidcmd(f"SIZE {path}")
+            return False  # 크기가 반환되면 파일
+        except error_perm as e:
+            message = str(e)
+            code = message[:3]
+            if code in ("500", "502"):
+                # SIZE 미지원 서버 - cwd 탐침으로 전환
+                return None
+            if code == "550" and "ascii" in message.lower():
+                # "550 SIZE not allowed in ASCII mode" 류의 거부 - 디렉토리라는
+                # 뜻이 아니므로 cwd 탐침으로 판별합니다
+                return None
+            # 550 등: 디렉토리(또는 크기 조회 불가 항목)
+            return code == "550"
+
+    def _probe_parallel(
+        self, ftp_conn: RobustFTPConnection, base_path: str, items: List[str]
+    ) -> List[Optional[bool]]:
+        """보조 연결 풀에서 SIZE 탐침을 병렬로 실행합니다. 입력 순서를 유지합니다."""
+        pool = self._get_probe_pool(ftp_conn)
+        if pool is None:
+            # 병렬 로그인 거부(421/530) 등으로 풀을 만들 수 없으면 순차 처리
+            return [self._probe_size(ftp_conn, item) for item in items]
+
+        base_path = base_path.rstrip("/")
+
+        def probe(item: str) -> Optional[bool]:
+            conn = pool.get()
+            try:
+                return self._probe_size(conn, f"{base_path}/{item}")
+            finally:
+                pool.put(conn)
+
+        # qsize()는 다른 워커가 연결을 빌려간 동안 0까지 내려갈 수 있으므로
+        # (ValueError) 실행기 크기는 풀의 정원인 max_workers로 고정합니다
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(probe, items))
+
+    def _get_probe_pool(self, ftp_conn: RobustFTPConnection) -> Optional[queue.Queue]:
+        """탐침용 보조 연결 풀을 반환합니다. 최초 호출 시 생성합니다.
+
+        워커 두 개가 동시에 최초 호출을 하면 풀이 두 번 만들어져 연결이
+        새므로, 생성 구간은 잠금으로 보호합니다.
+        """
+        with self._pool_lock:
+            if self._probe_conns is not None:
+                return self._probe_conns
+            pool: queue.Queue = queue.Queue()
+            try:
+                for _ in range(self.max_workers):
+                    conn = RobustFTPConnection(
+                        ftp_conn.host, ftp_conn.username, ftp_conn.password,
+                        use_tls=ftp_conn.use_tls,
+                    )
+                    try:
+                        # 탐침 전용 연결은 SIZE만 보내므로 바이너리로 고정
+                        conn.voidcmd("TYPE I")
+                    except Exception:
+                        pass
+                    pool.put(conn)
+            except Exception as e:
+                # 서버가 동시 로그인을 제한하는 경우(421/530 등) 순차 모드로 동작
+                logger.warning("병렬 탐침용 연결 생성 실패, 순차 처리로 전환: %s", e)
+                while not pool.empty():
+                    pool.get().close()
+                self.max_workers = 1
+                return None
+            self._probe_conns = pool
+            return pool
+
+    def close(self) -> None:
+        """보조 연결 풀을 종료합니다."""
+        if self._probe_conns is not None:
+            while not self._probe_conns.empty():
+                self._probe_conns.get().close()
+            self._probe_conns = None
+
     def get_strategy_name(self) -> str:
         """전략 이름을 반환합니다."""
         return "Fallback"
 
+    def requires_cwd(self) -> bool:
+        """nlst()는 CWD 기준으로 동작하므로 사전 CWD가 필요합니다."""
+        return True
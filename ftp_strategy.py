@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional, Tuple
 
+from log_utils import logger
 from robust_ftp import RobustFTPConnection
 
 
@@ -8,23 +9,32 @@ class FTPDirectoryStrategy(ABC):
     """FTP 디렉토리 내용 가져오기 전략의 추상 기본 클래스"""
     
     @abstractmethod
-    def get_directory_contents(self, ftp_conn: RobustFTPConnection) -> Optional[List[Tuple[str, bool]]]:
+    def get_directory_contents(self, ftp_conn: RobustFTPConnection, path: str) -> Optional[List[Tuple[str, bool]]]:
         """
         디렉토리 내용을 가져오는 추상 메서드
-        
+
         Args:
             ftp_conn: FTP 연결 객체
-            
+            path: 목록을 가져올 디렉토리의 절대 경로
+
         Returns:
             List[Tuple[str, bool]]: (파일명, is_directory) 튜플의 리스트 또는 None (실패시)
         """
         pass
-    
+
     @abstractmethod
     def get_strategy_name(self) -> str:
         """전략 이름을 반환하는 추상 메서드"""
         pass
 
+    def requires_cwd(self) -> bool:
+        """목록 조회 전에 해당 디렉토리로 CWD가 필요한지 여부
+
+        MLSD/LIST는 절대 경로 인자를 받으므로 기본값은 False입니다.
+        CWD 기준으로만 동작하는 전략이 True로 재정의합니다.
+        """
+        return False
+
 
 class FTPDirectoryContext:
     """FTP 디렉토리 내용 가져오기 전략을 관리하는 Context 클래스"""
@@ -40,32 +50,40 @@ class FTPDirectoryContext:
     def set_strategy(self, strategy: FTPDirectoryStrategy) -> None:
         """현재 사용할 전략을 설정합니다."""
         self._current_strategy = strategy
+
+    def set_strategy_by_name(self, name: str) -> Optional[FTPDirectoryStrategy]:
+        """이름으로 전략을 찾아 설정합니다. 없으면 None을 반환합니다."""
+        for strategy in self._strategies:
+            if strategy.get_strategy_name() == name:
+                self._current_strategy = strategy
+                return strategy
+        return None
     
-    def auto_select_strategy(self, ftp_conn: RobustFTPConnection) -> Optional[FTPDirectoryStrategy]:
+    def auto_select_strategy(self, ftp_conn: RobustFTPConnection, path: str) -> Optional[FTPDirectoryStrategy]:
         """
         사용 가능한 전략을 자동으로 선택합니다.
         우선순위에 따라 각 전략을 테스트하고 첫 번째로 성공하는 전략을 선택합니다.
         """
         for strategy in self._strategies:
             try:
-                result = strategy.get_directory_contents(ftp_conn)
+                result = strategy.get_directory_contents(ftp_conn, path)
                 if result is not None:
                     self._current_strategy = strategy
                     print(f"{strategy.get_strategy_name()} 전략이 선택되었습니다.")
                     return strategy
             except Exception as e:
-                print(f"{strategy.get_strategy_name()} 전략 테스트 실패: {e}")
+                logger.warning("%s 전략 테스트 실패: %s", strategy.get_strategy_name(), e)
                 continue
         
         print("사용 가능한 전략이 없습니다.")
         return None
     
-    def execute_strategy(self, ftp_conn: RobustFTPConnection) -> Optional[List[Tuple[str, bool]]]:
+    def execute_strategy(self, ftp_conn: RobustFTPConnection, path: str) -> Optional[List[Tuple[str, bool]]]:
         """현재 설정된 전략을 실행합니다."""
         if self._current_strategy is None:
             raise ValueError("전략이 설정되지 않았습니다. auto_select_strategy() 또는 set_strategy()를 먼저 호출하세요.")
-        
-        return self._current_strategy.get_directory_contents(ftp_conn)
+
+        return self._current_strategy.get_directory_contents(ftp_conn, path)
     
     def get_current_strategy_name(self) -> str:
         """현재 전략의 이름을 반환합니다."""
@@ -0,0 +1,31 @@
+import logging
+import time
+from typing import Dict
+
+
+class RateLimitingFilter(logging.Filter):
+    """같은 형식 문자열의 반복 로그를 시간창 안에서 억제하는 필터
+
+    불안정한 서버에서는 같은 오류가 항목 수만큼 반복될 수 있으므로,
+    메시지 형식 문자열별로 초당 한 건만 통과시킵니다. 로그 호출은
+    %-스타일 지연 포매팅을 사용해야 형식 문자열 기준으로 묶입니다.
+    """
+
+    def __init__(self, interval: float = 1.0) -> None:
+        super().__init__()
+        self.interval = interval
+        self._last_emit: Dict[str, float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = record.msg
+        now = time.monotonic()
+        last = self._last_emit.get(key)
+        if last is not None and now - last < self.interval:
+            return False
+        self._last_emit[key] = now
+        return True
+
+
+# 패키지 공용 로거. 오류/경고 경로는 print 대신 이 로거를 사용합니다.
+logger = logging.getLogger("ftp_scout")
+logger.addFilter(RateLimitingFilter())
@@ -1,104 +1,38 @@
 import argparse
-import os
+import logging
+import queue
+import sys
+import threading
 import time
-from collections import deque
-from typing import Generator
+from typing import Generator, Optional, Tuple
 
-from dir_handler import DIRStrategy
-from fallback_handler import FallbackStrategy
-from ftp_strategy import FTPDirectoryContext
-from mlsd_handler import MLSDStrategy
-from robust_ftp import RobustFTPConnection
+from log_utils import logger
+from scout import PREFETCH_DEPTH, FTPScout, listing_cache
 
 
 def generate_ftp_recursive_listing_optimized(
-    host: str, username: str, password: str, remote_start_path: str = "/"
-) -> Generator[str, None, None]:
+    host: str,
+    username: str,
+    password: str,
+    remote_start_path: str = "/",
+    connections: int = 4,
+    prefetch: int = PREFETCH_DEPTH,
+    use_tls: bool = False,
+) -> Generator[Tuple[str, bool], None, None]:
     """
-    최적화된 FTP 재귀 목록 생성기.
-    연결이 끊어지면 자동으로 재연결합니다.
-    MLSD -> DIR -> 백업 방식 순으로 시도합니다.
+    최적화된 FTP 재귀 목록 생성기. (경로, is_directory) 튜플을 생성합니다.
+
+    일회성 순회를 위한 FTPScout의 얇은 래퍼입니다. 순회가 끝나면 연결을
+    닫으므로, 같은 서버를 여러 번 걷는 장기 실행 코드는 FTPScout를 직접
+    잡고 walk()를 반복 호출해 접속 비용을 아끼는 편이 낫습니다.
     """
-    ftp_conn = None
     try:
-        ftp_conn = RobustFTPConnection(host, username, password)
-
-        # 시작 경로를 정규화합니다
-        normalized_start_path = remote_start_path.rstrip("/") + "/"
-
-        # 큐 초기화: (현재 FTP 서버의 경로, 현재까지의 상대 경로)
-        dirs_to_visit = deque([(normalized_start_path, "")])
-
-        # 전략 컨텍스트 설정
-        strategy_context = FTPDirectoryContext()
-        
-        # 우선순위에 따라 전략 추가 (높은 우선순위부터)
-        strategy_context.add_strategy(MLSDStrategy())    # 가장 효율적
-        strategy_context.add_strategy(DIRStrategy())     # 중간 효율성
-        strategy_context.add_strategy(FallbackStrategy()) # 가장 느리지만 호환성 높음
-        
-        # 최적의 전략 자동 선택
-        ftp_conn.cwd(normalized_start_path)
-        selected_strategy = strategy_context.auto_select_strategy(ftp_conn)
-        
-        if selected_strategy is None:
-            print("모든 전략이 실패했습니다.")
-            return
-
-        processed_count = 0
-        while dirs_to_visit:
-            current_ftp_dir, current_relative_path = dirs_to_visit.popleft()
-
-            # 일정 간격으로 연결 상태 확인
-            if processed_count % 50 == 0 and processed_count > 0:
-                ftp_conn.ensure_connected()
-
-            # FTP 서버에서 현재 디렉터리로 이동
-            try:
-                ftp_conn.cwd(current_ftp_dir)
-            except Exception as e:
-                print(f"디렉토리 변경 실패 {current_ftp_dir}: {e}")
-                continue
-
-            # 선택된 전략으로 디렉토리 내용 가져오기
-            try:
-                contents = strategy_context.execute_strategy(ftp_conn)
-            except Exception as e:
-                print(f"디렉토리 내용 가져오기 실패 {current_ftp_dir}: {e}")
-                continue
-
-            if not contents:
-                continue
-
-            for item_name, is_directory in contents:
-                # 완전한 경로 생성
-                full_item_path = os.path.join(current_relative_path, item_name).replace(
-                    "\\", "/"
-                )
-                final_path = os.path.join(
-                    normalized_start_path, full_item_path
-                ).replace("\\", "/")
-
-                if is_directory:
-                    # 디렉토리
-                    final_path = final_path.rstrip("/") + "/"
-                    yield final_path
-                    # 탐색할 디렉토리 큐에 추가
-                    ftp_item_path = os.path.join(current_ftp_dir, item_name).replace(
-                        "\\", "/"
-                    )
-                    dirs_to_visit.append((ftp_item_path + "/", full_item_path + "/"))
-                else:
-                    # 파일
-                    yield final_path
-
-            processed_count += 1
-
+        with FTPScout(
+            host, username, password, connections, prefetch, use_tls
+        ) as scout:
+            yield from scout.walk(remote_start_path)
     except Exception as e:
-        print(f"FTP 작업 중 오류 발생: {e}")
-    finally:
-        if ftp_conn:
-            ftp_conn.close()
+        logger.error("FTP 작업 중 오류 발생: %s", e)
 
 
 def main() -> None:
@@ -107,9 +41,34 @@ def main() -> None:
     parser.add_argument("host", help="FTP 서버 호스트 주소")
     parser.add_argument("username", help="FTP 사용자명")
     parser.add_argument("-d", "--directory", default="/", help="탐색할 디렉토리 경로 (기본값: /)")
+    parser.add_argument(
+        "-c", "--connections", type=int, default=4,
+        help="병렬 순회에 사용할 FTP 연결 수 (기본값: 4, 1이면 순차)",
+    )
+    parser.add_argument(
+        "--tls", action="store_true",
+        help="FTPS(명시적 TLS)로 접속합니다",
+    )
+    parser.add_argument(
+        "--cache-ttl", type=float, default=None,
+        help="디렉토리 목록 캐시 TTL(초). 기본값은 FTPSCOUT_CACHE_TTL 또는 3600",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=None,
+        help="디렉토리 목록 캐시 최대 항목 수 (기본값: 1000)",
+    )
     
     args = parser.parse_args()
-    
+
+    # 경고/오류는 목록 출력과 섞이지 않도록 stderr 로거로 내보냅니다
+    logging.basicConfig(format="%(levelname)s %(name)s: %(message)s")
+
+    # 명령행에서 캐시 파라미터를 조정할 수 있습니다 (환경 변수보다 우선)
+    if args.cache_ttl is not None:
+        listing_cache.ttl = args.cache_ttl
+    if args.cache_size is not None:
+        listing_cache.max_entries = args.cache_size
+
     print("=== FTP 디렉토리 탐색기 ===")
     
     # 명령행에서 받은 정보
@@ -131,16 +90,61 @@ def main() -> None:
 
     file_count = 0
     directory_count = 0
-    for item in generate_ftp_recursive_listing_optimized(
-        ftp_host, ftp_user, ftp_pass, ftp_dir
+
+    # stdout 쓰기(특히 TTY는 줄마다 동기 플러시)가 네트워크 소비 루프를
+    # 막지 않도록 출력은 전담 스레드로 분리합니다. 경계 큐라서 출력이
+    # 밀리면 순회 쪽이 잠시 기다리므로 메모리 상한도 겸합니다.
+    print_queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=1024)
+
+    def printer() -> None:
+        write = sys.stdout.write
+        get_nowait = print_queue.get_nowait
+        # 출력 파이프가 끊겨도(예: | head) 큐는 계속 비워야 생산자가
+        # 가득 찬 큐의 put()에 영원히 막히지 않습니다. 끊긴 뒤의 항목은
+        # 쓰지 않고 버립니다.
+        stdout_alive = True
+        while True:
+            line = print_queue.get()
+            if line is None:
+                return
+            # 큐에 이미 쌓인 줄들을 모아 한 번의 write로 내보냅니다
+            batch = [line]
+            saw_sentinel = False
+            try:
+                while len(batch) < 1000:
+                    line = get_nowait()
+                    if line is None:
+                        saw_sentinel = True
+                        break
+                    batch.append(line)
+            except queue.Empty:
+                pass
+            if stdout_alive:
+                try:
+                    write("".join(batch))
+                except OSError:
+                    stdout_alive = False  # BrokenPipeError 등 - 이후는 버림
+            if saw_sentinel:
+                return
+
+    printer_thread = threading.Thread(target=printer, daemon=True)
+    printer_thread.start()
+
+    for item, is_dir in generate_ftp_recursive_listing_optimized(
+        ftp_host, ftp_user, ftp_pass, ftp_dir,
+        connections=args.connections, use_tls=args.tls,
     ):
-        if item.endswith("/"):
-            print(f"[디렉토리] {item}")
+        # 생성기가 이미 알고 있는 종류 정보를 받으므로 경로를 다시 검사하지 않습니다
+        if is_dir:
+            print_queue.put(f"[디렉토리] {item}\n")
             directory_count += 1
         else:
-            print(f"[파일] {item}")
+            print_queue.put(f"[파일] {item}\n")
             file_count += 1
 
+    print_queue.put(None)  # 출력 종료 센티널
+    printer_thread.join()
+
     # 실행 시간 측정 종료
     end_time = time.time()
     execution_time = end_time - start_time
@@ -1,29 +1,119 @@
+import socket
+from ftplib import error_temp
 from typing import List, Optional, Tuple
 
 from ftp_strategy import FTPDirectoryStrategy
+from log_utils import logger
 from robust_ftp import RobustFTPConnection
 
+# "OPTS MLST Type;" 협상 뒤에는 대부분의 줄에서 fact부가 아래 문자열과
+# 정확히 일치하므로, 딕셔너리 조회 한 번으로 find/슬라이스 경로 전체를
+# 건너뜁니다. 일치하지 않는 서버만 일반 탐색 경로로 내려갑니다.
+_COMMON_FACTS = {
+    "type=file;": "file",
+    "type=dir;": "dir",
+    "type=cdir;": "cdir",
+    "type=pdir;": "pdir",
+    "Type=file;": "file",
+    "Type=dir;": "dir",
+    "Type=cdir;": "cdir",
+    "Type=pdir;": "pdir",
+}
+
 
 class MLSDStrategy(FTPDirectoryStrategy):
     """MLSD 명령어를 사용하여 디렉토리 내용을 가져오는 전략"""
     
-    def get_directory_contents(self, ftp_conn: RobustFTPConnection) -> Optional[List[Tuple[str, bool]]]:
+    def get_directory_contents(self, ftp_conn: RobustFTPConnection, path: str) -> Optional[List[Tuple[str, bool]]]:
         """
         MLSD 명령어를 사용하여 디렉토리 내용을 가져옵니다.
+        경로를 인자로 전달하므로 사전 CWD 왕복이 필요 없습니다.
+
+        서버가 MLSC를 광고하면 같은 형식의 목록을 제어 채널로 받아
+        디렉토리마다 드는 PASV 협상 + 데이터 연결 핸드셰이크를 생략합니다.
+        MLSC가 실패하면 해당 연결에서 비활성화하고 MLSD로 되돌아갑니다.
+
+        ftplib의 mlsd()는 항목마다 모든 fact를 딕셔너리로 만들지만 여기서는
+        type 하나만 쓰므로, 원시 MLSD 응답에서 type fact만 직접 잘라내
+        항목당 할당을 최소화합니다. "."/".."는 이름 검사 없이 cdir/pdir
+        type으로 걸러집니다.
 
         Returns:
             List[Tuple[str, bool]]: (파일명, is_directory) 튜플의 리스트 또는 None (실패시)
         """
         try:
             contents = []
-            for name, facts in ftp_conn.mlsd():
-                if name in (".", ".."):
-                    continue
-                is_dir = facts.get("type", "").lower() == "dir"
-                contents.append((name, is_dir))
+            append = contents.append
+            common_facts_get = _COMMON_FACTS.get
+
+            def parse_line(line):
+                # "type=dir;modify=...; 이름" 형식 - fact부와 이름은 첫 공백으로 구분
+                facts, sep, name = line.partition(" ")
+                if not sep or not name:
+                    return
+
+                entry_type = common_facts_get(facts)
+                if entry_type is not None:
+                    # 협상된 최소 fact 집합의 전형적인 줄 - 탐색 없이 분기만
+                    if entry_type == "dir":
+                        append((name, True))
+                    elif entry_type == "file":
+                        append((name, False))
+                    # cdir/pdir("."/"..")는 버립니다
+                    return
+
+                start = facts.find("type=")
+                # "media-type=" 같은 다른 fact 이름 내부에 걸리지 않도록
+                # fact 경계(문자열 시작 또는 ';' 바로 뒤)에서만 인정합니다
+                while start > 0 and facts[start - 1] != ";":
+                    start = facts.find("type=", start + 5)
+                if start < 0:
+                    # fact 이름은 대소문자를 구분하지 않으므로 드문 경우에만 소문자화
+                    lowered_facts = facts.lower()
+                    start = lowered_facts.find("type=")
+                    while start > 0 and lowered_facts[start - 1] != ";":
+                        start = lowered_facts.find("type=", start + 5)
+                if start < 0:
+                    entry_type = ""
+                else:
+                    start += 5  # len("type=")
+                    end = facts.find(";", start)
+                    entry_type = facts[start:end] if end >= 0 else facts[start:]
+
+                # 대부분의 서버는 소문자 fact를 보내므로 .lower()는 예외 경로에서만
+                if entry_type == "dir":
+                    is_dir = True
+                elif entry_type == "cdir" or entry_type == "pdir":
+                    return  # "."/".." 대응 항목
+                elif entry_type == "file" or entry_type == "":
+                    is_dir = False
+                else:
+                    lowered = entry_type.lower()
+                    if lowered == "cdir" or lowered == "pdir":
+                        return
+                    is_dir = lowered == "dir"
+
+                append((name, is_dir))
+
+            if ftp_conn.supports_mlsc:
+                try:
+                    for line in ftp_conn.mlsc(path):
+                        parse_line(line)
+                    return contents
+                except Exception as e:
+                    # FEAT에 있어도 실제로는 거부하는 서버가 있으므로
+                    # 이 연결에서는 끄고 MLSD로 계속 진행합니다
+                    logger.warning("MLSC 실패, MLSD로 전환: %s", e)
+                    ftp_conn.supports_mlsc = False
+                    contents.clear()
+
+            ftp_conn.retrlines(f"MLSD {path}", parse_line)
             return contents
+        except (EOFError, ConnectionError, socket.timeout, error_temp):
+            # 연결성 오류는 호출자가 재연결 후 한 번 더 시도하도록 전달
+            raise
         except Exception as e:
-            print(f"MLSD 실패: {e}")
+            logger.warning("MLSD 실패: %s", e)
             return None
     
     def get_strategy_name(self) -> str:
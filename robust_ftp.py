@@ -1,33 +1,97 @@
+import random
 import socket
-import time
-from ftplib import FTP, error_temp
-from typing import Optional
+import ssl
+import threading
+from ftplib import FTP, FTP_TLS, error_perm, error_temp
+from typing import List, Optional
+
+from log_utils import logger
 
 
 class RobustFTPConnection:
     """재연결 기능이 있는 견고한 FTP 연결 클래스"""
-    
+
     # 클래스 필드 타입 선언
     host: str
     username: str
     password: str
     ftp: Optional[FTP]
+    features: str  # 서버 FEAT 응답 원문 (기능 확인용)
+    supports_mlsc: bool  # 제어 채널 목록(MLSC) 지원 여부
+
+    # 이 횟수의 명령마다 한 번씩만 연결 상태를 선제 검사합니다
+    HEALTH_CHECK_INTERVAL = 50
+
+    # 재연결 백오프: base * 2^시도 를 cap으로 자른 범위에서 균등 추출
+    BACKOFF_BASE = 1.0
+    BACKOFF_CAP = 30.0
 
-    def __init__(self, host: str, username: str, password: str) -> None:
+    def __init__(
+        self, host: str, username: str, password: str, use_tls: bool = False
+    ) -> None:
         """
         FTP 연결 객체를 초기화합니다.
-        
+
         Args:
             host: FTP 서버 호스트 주소
             username: FTP 사용자명
             password: FTP 비밀번호
+            use_tls: True면 FTPS(명시적 TLS)로 접속하고 데이터 채널도 보호
         """
         self.host = host
         self.username = username
         self.password = password
+        self.use_tls = use_tls
+        # SSL 컨텍스트를 재연결 간에 공유하면 내부 세션 캐시 덕분에 서버가
+        # TLS 세션 재개(약식 핸드셰이크)를 허용해 재연결 왕복이 줄어듭니다
+        self._ssl_context = ssl.create_default_context() if use_tls else None
+        # 호스트 이름은 여기서 한 번만 해석합니다. 재연결 때마다 리졸버를
+        # 다시 두드리지 않고, A/AAAA 중 실제로 연결되는 주소를 기억해 둡니다.
+        # 해석에 실패하면 connect()가 호스트 이름으로 직접 접속을 시도합니다.
+        try:
+            self._addrinfo = socket.getaddrinfo(
+                host, 21, type=socket.SOCK_STREAM
+            )
+        except OSError:
+            self._addrinfo = []
         self.ftp: Optional[FTP] = None
+        self.features = ""
+        self.supports_mlsc = False
+        self._feat_checked = False  # FEAT는 첫 접속에서 한 번만 조회
+        self._ops_since_check = 0
+        # abort()로 설정되면 백오프 대기가 즉시 풀리고 재시도를 멈춥니다
+        self._abort_event = threading.Event()
         self.connect()
 
+    def _backoff(self, attempt: int) -> None:
+        """재시도 전 지터를 섞어 대기합니다.
+
+        여러 연결(병렬 워커)이 같은 장애로 동시에 끊기면 순수 지수 백오프는
+        모두 같은 순간에 재접속을 시도해 복구 중인 서버를 다시 때립니다.
+        [0, min(cap, base*2^시도)] 균등 추출로 재시도 시점을 흩뜨리고,
+        Event.wait를 쓰므로 abort() 호출 시 대기가 즉시 풀립니다.
+        """
+        delay = random.uniform(
+            0, min(self.BACKOFF_CAP, self.BACKOFF_BASE * (2 ** attempt))
+        )
+        self._abort_event.wait(delay)
+
+    def abort(self) -> None:
+        """진행 중인 백오프 대기를 풀고 이후 재시도를 중단시킵니다.
+
+        종료 신호를 받은 호출자가 최대 수십 초짜리 백오프가 끝나기를
+        기다리지 않고 빠져나올 수 있게 합니다.
+        """
+        self._abort_event.set()
+
+    def resume(self) -> None:
+        """abort()로 멈춘 재시도를 다시 허용합니다.
+
+        순회를 중단시키며 abort()한 연결을 닫지 않고 다음 순회에 재사용할
+        때 호출합니다.
+        """
+        self._abort_event.clear()
+
     def connect(self, max_retries: int = 3) -> None:
         """FTP 서버에 연결합니다."""
         for attempt in range(max_retries + 1):
@@ -38,49 +102,176 @@ class RobustFTPConnection:
                     except Exception:
                         pass
 
-                self.ftp = FTP(self.host, timeout=30)
+                self.ftp = self._make_ftp()
+                self._tune_control_socket()
                 self.ftp.login(user=self.username, passwd=self.password)
-                print(f"Connected to FTP server: {self.host} (attempt {attempt + 1})")
+                if self.use_tls:
+                    self.ftp.prot_p()  # 데이터 채널(목록 전송)도 TLS로 보호
+                self._negotiate_features()
+                logger.info("Connected to FTP server: %s (attempt %d)", self.host, attempt + 1)
                 return
             except (ConnectionError, socket.timeout, socket.error, error_temp) as e:
-                print(f"FTP 연결 실패 (시도 {attempt + 1}/{max_retries + 1}): {e}")
-                if attempt == max_retries:
+                logger.warning("FTP 연결 실패 (시도 %d/%d): %s", attempt + 1, max_retries + 1, e)
+                if attempt == max_retries or self._abort_event.is_set():
                     raise
-                time.sleep(2**attempt)  # 지수적 백오프
+                self._backoff(attempt)
             except Exception as e:
-                print(f"FTP 연결 중 오류 발생: {e}")
+                logger.warning("FTP 연결 중 오류 발생: %s", e)
                 raise
 
+    def _make_ftp(self) -> FTP:
+        """미리 해석해 둔 주소로 제어 연결을 맺은 FTP 인스턴스를 만듭니다.
+
+        해석된 주소를 순서대로 짧은 타임아웃으로 시도해 처음 연결되는
+        주소를 쓰고, 그 주소를 목록 맨 앞으로 올려 다음 재연결에서는
+        탐색 없이 바로 붙습니다(v4/v6 선호도 캐시). TLS는 인증서 검증에
+        호스트 이름이 필요하므로 이름으로 접속합니다.
+        """
+        if self.use_tls:
+            return FTP_TLS(self.host, timeout=30, context=self._ssl_context)
+
+        last_error: Optional[OSError] = None
+        for index, info in enumerate(self._addrinfo):
+            ip = info[4][0]
+            try:
+                ftp = FTP(timeout=10)  # 주소별 탐색은 짧게 끊습니다
+                ftp.connect(ip, 21)
+            except OSError as e:
+                last_error = e
+                continue
+            # 연결 후에는 일반 명령용 타임아웃으로 되돌립니다
+            ftp.timeout = 30
+            if ftp.sock is not None:
+                ftp.sock.settimeout(30)
+            if index:
+                self._addrinfo.insert(0, self._addrinfo.pop(index))
+            return ftp
+
+        if last_error is not None:
+            raise last_error
+        # 해석된 주소가 없으면(리졸버 일시 장애 등) 이름으로 직접 접속
+        return FTP(self.host, timeout=30)
+
+    def _tune_control_socket(self) -> None:
+        """제어 소켓에 keep-alive와 TCP_NODELAY를 설정합니다.
+
+        짧은 명령을 계속 주고받는 제어 채널에서 Nagle 알고리즘은 명령당
+        최대 40ms의 전송 지연을 만들 수 있으므로 TCP_NODELAY로 끕니다.
+        keep-alive는 유휴 상태에서 NAT/방화벽이 연결을 끊는 것을 막고,
+        죽은 연결을 30초 유휴 + 10초 간격 프로브로 빨리 감지하게 합니다.
+        옵션을 지원하지 않는 플랫폼에서는 조용히 건너뜁니다.
+        """
+        sock = self.ftp.sock
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+            if hasattr(socket, "TCP_KEEPINTVL"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+        except OSError as e:
+            logger.warning("제어 소켓 옵션 설정 실패 (무시하고 진행): %s", e)
+
+    def _negotiate_features(self) -> None:
+        """로그인 직후 서버 기능을 조회하고 최소 fact 집합을 협상합니다.
+
+        MLSD 응답에서는 type fact만 사용하므로, 서버가 MLST를 지원하면
+        "OPTS MLST Type;"으로 size/modify/perm 등 나머지 fact 전송을 끕니다.
+        깊은 트리에서는 목록 바이트 수와 파싱 비용이 그만큼 줄어듭니다.
+
+        서버 기능 집합은 세션이 바뀌어도 변하지 않으므로 FEAT 응답은 첫
+        접속에서만 조회하고 재연결 때는 캐시를 재사용합니다(왕복 1회 절약).
+        OPTS MLST는 세션별 상태라서 재연결마다 다시 보내야 합니다.
+        """
+        if not self._feat_checked:
+            self._feat_checked = True
+            try:
+                self.features = self.ftp.sendcmd("FEAT")
+            except Exception:
+                # FEAT 미지원 서버 - 협상 없이 기본 동작 (재조회하지 않음)
+                self.features = ""
+        if not self.features:
+            self.supports_mlsc = False
+            return
+
+        # MLSC(Globus/dCache 확장)는 목록을 제어 채널로 반환하므로
+        # 디렉토리마다 데이터 연결을 열 필요가 없습니다
+        self.supports_mlsc = "MLSC" in self.features.upper()
+
+        if "MLST" in self.features.upper():
+            try:
+                self.ftp.sendcmd("OPTS MLST Type;")
+            except Exception as e:
+                logger.warning("OPTS MLST 협상 실패 (무시하고 진행): %s", e)
+
     def is_connected(self) -> bool:
-        """FTP 연결이 살아있는지 확인합니다."""
+        """FTP 연결이 살아있는지 확인합니다.
+
+        PWD 왕복 대신 소켓 상태만 보는 수동 검사입니다: 닫힌 fd, 보류 중인
+        소켓 오류, 상대방이 보낸 FIN(읽기 가능인데 0바이트)을 확인합니다.
+        서버와의 왕복이 없으므로 건강한 연결에서는 비용이 거의 없습니다.
+        """
+        if not self.ftp:
+            return False
+        sock = self.ftp.sock
+        if sock is None:
+            return False
         try:
-            if not self.ftp:
+            if sock.fileno() < 0:
+                return False
+            if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
                 return False
-            self.ftp.pwd()
-            return True
+            if isinstance(sock, ssl.SSLSocket):
+                # SSLSocket.recv는 MSG_PEEK 같은 플래그를 허용하지 않으므로
+                # (ValueError) TLS 연결은 가벼운 PWD 왕복으로 확인합니다
+                self.ftp.pwd()
+                return True
+            prev_timeout = sock.gettimeout()
+            sock.settimeout(0)  # 논블로킹으로 잠깐 전환해 FIN 여부만 훔쳐봅니다
+            try:
+                return sock.recv(1, socket.MSG_PEEK) != b""
+            except BlockingIOError:
+                return True  # 읽을 데이터 없음 = 정상 유휴 상태
+            finally:
+                sock.settimeout(prev_timeout)
         except Exception:
             return False
 
     def ensure_connected(self) -> None:
         """연결이 끊어졌다면 재연결합니다."""
         if not self.is_connected():
-            print("FTP 연결이 끊어졌습니다. 재연결을 시도합니다...")
+            logger.warning("FTP 연결이 끊어졌습니다. 재연결을 시도합니다...")
             self.connect()
-            print("FTP 재연결 성공")
+            logger.info("FTP 재연결 성공")
 
     def execute_with_retry(self, func, *args, max_retries: int = 3, **kwargs):
-        """FTP 명령을 재시도 로직과 함께 실행합니다."""
+        """FTP 명령을 재시도 로직과 함께 실행합니다.
+
+        매 명령마다 연결 상태를 검사하는 대신 HEALTH_CHECK_INTERVAL 회마다
+        한 번씩만 선제 검사합니다. 그 사이에 연결이 끊기면 명령 자체가
+        연결성 예외를 던지므로, 예외를 신호로 삼아 재시도 직전에
+        ensure_connected()로 복구합니다.
+        """
         for retry in range(max_retries):
             try:
-                self.ensure_connected()
+                self._ops_since_check += 1
+                if retry > 0 or self._ops_since_check >= self.HEALTH_CHECK_INTERVAL:
+                    self._ops_since_check = 0
+                    self.ensure_connected()
                 return func(*args, **kwargs)
-            except (ConnectionError, socket.timeout, socket.error, error_temp) as e:
-                print(f"FTP 명령 실패 (시도 {retry + 1}): {e}")
-                if retry == max_retries - 1:
+            except (EOFError, ConnectionError, socket.timeout, socket.error, error_temp) as e:
+                # ftplib는 끊긴 연결에서 EOFError를 가장 흔하게 던집니다
+                logger.warning("FTP 명령 실패 (시도 %d): %s", retry + 1, e)
+                if retry == max_retries - 1 or self._abort_event.is_set():
                     raise
-                time.sleep(1)
+                self._backoff(retry)
+            except error_perm:
+                # 영구 오류(5xx)는 재시도 의미가 없으므로 호출자가 처리하도록 전달
+                raise
             except Exception as e:
-                print(f"FTP 명령 중 예상치 못한 오류: {e}")
+                logger.warning("FTP 명령 중 예상치 못한 오류: %s", e)
                 raise
 
     def cwd(self, path: str) -> None:
@@ -91,21 +282,48 @@ class RobustFTPConnection:
         """MLSD 명령 (재시도 포함)"""
         return self.execute_with_retry(self.ftp.mlsd, *args, **kwargs)
 
-    def dir(self, callback) -> None:
-        """DIR 명령 (재시도 포함)"""
-        return self.execute_with_retry(self.ftp.dir, callback)
+    def dir(self, *args) -> None:
+        """DIR 명령 (재시도 포함). 경로 인자와 콜백을 그대로 전달합니다."""
+        return self.execute_with_retry(self.ftp.dir, *args)
+
+    def mlsc(self, path: str) -> List[str]:
+        """MLSC 명령 실행 (재시도 포함). MLSD 형식 항목 줄들을 반환합니다.
+
+        MLSD는 디렉토리마다 PASV 협상과 데이터 연결 TCP 핸드셰이크를
+        치르지만, MLSC는 같은 목록을 제어 채널 멀티라인 응답으로 보내므로
+        디렉토리당 왕복 약 2회와 연결 비용이 사라집니다.
+        """
+        response = self.execute_with_retry(self.ftp.sendcmd, f"MLSC {path}")
+        lines = response.splitlines()
+        # 첫 줄(250-...)과 마지막 줄(250 ...)은 상태 줄이므로 제외하고,
+        # 멀티라인 연속 규약의 선행 공백 하나를 벗겨냅니다
+        return [
+            line[1:] if line.startswith(" ") else line for line in lines[1:-1]
+        ]
+
+    def retrlines(self, cmd: str, callback) -> str:
+        """텍스트 응답 명령을 줄 단위 콜백으로 실행 (재시도 포함)"""
+        return self.execute_with_retry(self.ftp.retrlines, cmd, callback)
 
     def nlst(self, *args, **kwargs):
         """NLST 명령 (재시도 포함)"""
         return self.execute_with_retry(self.ftp.nlst, *args, **kwargs)
 
+    def pwd(self) -> str:
+        """현재 디렉토리 경로 반환 (재시도 포함)"""
+        return self.execute_with_retry(self.ftp.pwd)
+
+    def voidcmd(self, cmd: str) -> str:
+        """임의의 FTP 명령 실행 (재시도 포함)"""
+        return self.execute_with_retry(self.ftp.voidcmd, cmd)
+
     def close(self) -> None:
         """FTP 연결을 종료합니다."""
         if self.ftp:
             try:
                 self.ftp.quit()
-                print("FTP connection closed.")
+                logger.info("FTP connection closed.")
             except Exception as e:
-                print(f"FTP 연결 종료 중 오류: {e}")
+                logger.warning("FTP 연결 종료 중 오류: %s", e)
             finally:
                 self.ftp = None 
\ No newline at end of file
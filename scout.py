@@ -0,0 +1,401 @@
+"""FTP 재귀 순회의 핵심 로직 (연결 보유 객체와 순회 생성기)
+
+FTPScout는 연결과 선택된 전략을 인스턴스 수명 동안 유지하므로, 서버나
+장기 실행 컨텍스트에서 walk()를 여러 번 호출해도 접속마다 드는
+TCP+로그인+FEAT 협상 비용(수백 ms)을 다시 치르지 않습니다.
+"""
+
+import queue
+import socket
+import sys
+import threading
+from ftplib import error_temp
+from typing import Generator, List, Optional, Tuple
+
+from dir_cache import DirectoryListingCache
+from dir_handler import DIRStrategy
+from fallback_handler import FallbackStrategy
+from ftp_strategy import FTPDirectoryContext, FTPDirectoryStrategy
+from log_utils import logger
+from mlsd_handler import MLSDStrategy
+from robust_ftp import RobustFTPConnection
+from strategy_cache import (
+    invalidate_cached_strategy,
+    load_cached_strategy,
+    save_cached_strategy,
+)
+
+# 프로세스 전역 디렉토리 목록 캐시 (호스트+경로 기준, LRU+TTL)
+listing_cache = DirectoryListingCache()
+
+# 기본 프리페치 창: 소비자보다 앞서 가져와 둘 디렉토리 목록 수
+PREFETCH_DEPTH = 8
+
+# (디렉토리 FTP 경로, 상대 경로, 디렉토리 내용) - 순회 중간 산출물
+DirListing = Tuple[str, str, List[Tuple[str, bool]]]
+
+
+def _fetch_listing(
+    ftp_conn: RobustFTPConnection,
+    strategy_context: FTPDirectoryContext,
+    host: str,
+    path: str,
+    needs_cwd: bool,
+    cwd_tracker: List[str],
+) -> Optional[List[Tuple[str, bool]]]:
+    """한 디렉토리의 목록을 가져옵니다 (CWD 처리·캐시·오류 시 재연결 포함).
+
+    주기적 헬스체크 대신, 연결성 오류가 실제로 발생했을 때만 재연결 후
+    한 번 더 시도합니다. 실패하면 None을 반환하고 해당 캐시를 무효화합니다.
+    """
+    # CWD 기준 전략일 때만 디렉터리로 이동 (이미 해당 위치면 생략)
+    if needs_cwd and cwd_tracker[0] != path:
+        try:
+            ftp_conn.cwd(path)
+            cwd_tracker[0] = path
+        except Exception as e:
+            logger.warning("디렉토리 변경 실패 %s: %s", path, e)
+            listing_cache.invalidate(host, path)
+            return None
+
+    def fetch() -> Optional[List[Tuple[str, bool]]]:
+        return strategy_context.execute_strategy(ftp_conn, path)
+
+    try:
+        try:
+            return listing_cache.get_or_fetch(host, path, fetch)
+        except (EOFError, ConnectionError, socket.timeout, error_temp):
+            ftp_conn.ensure_connected()
+            return listing_cache.get_or_fetch(host, path, fetch)
+    except Exception as e:
+        logger.warning("디렉토리 내용 가져오기 실패 %s: %s", path, e)
+        listing_cache.invalidate(host, path)
+        # 전략이 순회 중 실패하면 다음 실행에서 다시 탐색하도록 캐시 무효화
+        invalidate_cached_strategy(host)
+        return None
+
+
+def _walk_listings(
+    ftp_conn: RobustFTPConnection,
+    strategy_context: FTPDirectoryContext,
+    host: str,
+    start_path: str,
+    needs_cwd: bool,
+) -> Generator[DirListing, None, None]:
+    """시작 경로부터 깊이 우선으로 디렉토리 목록을 하나씩 생성합니다.
+
+    스택의 pop()이 LIFO이므로 방문 순서는 깊이 우선이고, 스택에는 현재
+    경로의 조상별 형제들만 남습니다. 너비 우선과 달리 최대 스택 크기가
+    트리의 너비가 아니라 깊이 x 평균 형제 수에 비례하므로, 디렉토리가
+    수십만 개인 트리에서도 방문 대기 목록이 수 MB로 부풀지 않습니다.
+    """
+    dirs_to_visit = [(start_path, "")]
+    # 마지막으로 CWD한 경로 (중복 CWD 생략용). 캐시된 전략을 쓰면 시작
+    # 경로로 CWD하지 않은 채 들어오므로 빈 값으로 시작해야 첫 디렉토리도
+    # 이동을 생략하지 않습니다 (병렬 워커와 동일).
+    cwd_tracker = [""]
+    # 스택에 쌓이는 디렉토리 경로는 형제 항목의 접두어로 반복 등장하므로
+    # intern으로 동일 문자열을 한 객체로 공유해 할당을 줄입니다.
+    intern = sys.intern
+
+    while dirs_to_visit:
+        current_ftp_dir, current_relative_path = dirs_to_visit.pop()
+        contents = _fetch_listing(
+            ftp_conn, strategy_context, host, current_ftp_dir, needs_cwd, cwd_tracker
+        )
+        if not contents:
+            continue
+
+        yield current_ftp_dir, current_relative_path, contents
+
+        for item_name, is_directory in contents:
+            if is_directory:
+                dirs_to_visit.append(
+                    (
+                        intern(current_ftp_dir + item_name + "/"),
+                        intern(current_relative_path + item_name + "/"),
+                    )
+                )
+
+
+def _walk_listings_parallel(
+    conns: List[RobustFTPConnection],
+    strategy_context: FTPDirectoryContext,
+    host: str,
+    start_path: str,
+    needs_cwd: bool,
+    prefetch: int = PREFETCH_DEPTH,
+) -> Generator[DirListing, None, None]:
+    """여러 연결로 디렉토리 목록을 병렬 조회합니다.
+
+    FTP 제어 연결은 서로 독립적이므로, 워커 스레드마다 연결 하나씩을 주고
+    공유 작업 큐에서 디렉토리를 꺼내 조회하게 하면 디렉토리 수만큼 쌓이는
+    왕복 지연이 연결 수만큼 겹쳐집니다. 발견한 하위 디렉토리는 워커가
+    작업 큐에 되넣고, 완성된 목록은 결과 큐를 통해 호출자에게 전달됩니다.
+    결과 큐는 prefetch 개로 제한되어 소비자보다 그만큼만 앞서 갑니다
+    (메모리 상한이자 워커의 자연스러운 속도 조절 장치). 항목 순서는
+    보장하지 않습니다. 소비자가 제너레이터를 중간에 버리면(close/GC)
+    종료 플래그로 워커들을 깨워 정리하므로, 같은 연결로 다음 walk()를
+    시작해도 이전 워커가 남아 있지 않습니다.
+    """
+    work_queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue()
+    result_queue: "queue.Queue[Optional[DirListing]]" = queue.Queue(maxsize=prefetch)
+    state_lock = threading.Lock()
+    shutdown = threading.Event()  # 소비자가 사라지면 설정됩니다
+    outstanding = [1]  # 아직 처리가 끝나지 않은 디렉토리 수
+
+    work_queue.put((start_path, ""))
+    intern = sys.intern
+
+    def emit(listing: DirListing) -> bool:
+        """결과를 큐에 넣습니다. 소비자가 떠났으면 False를 반환합니다."""
+        while not shutdown.is_set():
+            try:
+                result_queue.put(listing, timeout=0.5)
+                return True
+            except queue.Full:
+                continue  # 소비자가 느린 것뿐인지 떠난 것인지 주기적으로 확인
+        return False
+
+    def worker(conn: RobustFTPConnection) -> None:
+        cwd_tracker = [""]
+        while True:
+            task = work_queue.get()
+            if task is None or shutdown.is_set():
+                break
+            path, rel = task
+
+            contents = _fetch_listing(
+                conn, strategy_context, host, path, needs_cwd, cwd_tracker
+            )
+            if contents:
+                with state_lock:
+                    for item_name, is_directory in contents:
+                        if is_directory:
+                            outstanding[0] += 1
+                            work_queue.put(
+                                (
+                                    intern(path + item_name + "/"),
+                                    intern(rel + item_name + "/"),
+                                )
+                            )
+                if not emit((path, rel, contents)):
+                    break  # 소비자가 떠남 - 정리 중
+
+            with state_lock:
+                outstanding[0] -= 1
+                finished = outstanding[0] == 0
+            if finished:
+                # 모든 디렉토리 처리 완료: 워커와 소비자에게 종료 신호 전달
+                for _ in conns:
+                    work_queue.put(None)
+                emit(None)
+
+    threads = [
+        threading.Thread(target=worker, args=(conn,), daemon=True) for conn in conns
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            listing = result_queue.get()
+            if listing is None:
+                break
+            yield listing
+    finally:
+        # 정상 종료든 조기 종료(GeneratorExit)든 워커를 확실히 끝냅니다.
+        # 연결을 쥔 워커가 남아 있으면 다음 walk()의 워커와 한 제어 채널을
+        # 나눠 쓰게 되므로, 여기서 합류할 때까지 기다립니다.
+        shutdown.set()
+        for conn in conns:
+            conn.abort()  # 진행 중인 재시도 백오프(최대 30초)를 즉시 해제
+        for _ in threads:
+            work_queue.put(None)  # work_queue.get()에 막힌 워커를 깨웁니다
+        for thread in threads:
+            thread.join()
+        for conn in conns:
+            conn.resume()  # 같은 연결로 다음 walk()가 다시 재시도할 수 있게
+
+
+class FTPScout:
+    """연결을 보유한 FTP 재귀 탐색기
+
+    연결(기본 + 보조)과 선택된 전략을 인스턴스 수명 동안 유지하므로,
+    walk()를 여러 번 호출해도 접속·로그인·전략 탐색 비용을 한 번만
+    치릅니다. 컨텍스트 매니저로 사용할 수 있습니다:
+
+        with FTPScout(host, user, password) as scout:
+            for path, is_dir in scout.walk("/data/"):
+                ...
+            for path, is_dir in scout.walk("/logs/"):
+                ...
+    """
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        connections: int = 4,
+        prefetch: int = PREFETCH_DEPTH,
+        use_tls: bool = False,
+    ) -> None:
+        """
+        Args:
+            host: FTP 서버 호스트 주소
+            username: FTP 사용자명
+            password: FTP 비밀번호
+            connections: 병렬 순회에 사용할 연결 수 (1이면 순차)
+            prefetch: 소비자보다 앞서 가져와 둘 디렉토리 목록 수
+            use_tls: True면 모든 연결을 FTPS(명시적 TLS)로 맺습니다
+        """
+        self.host = host
+        self.username = username
+        self.password = password
+        self.connections = max(connections, 1)
+        self.prefetch = prefetch
+        self.use_tls = use_tls
+
+        self._conn = RobustFTPConnection(host, username, password, use_tls=use_tls)
+        self._extra_conns: List[RobustFTPConnection] = []
+        self._extra_conns_ready = False
+
+        # 우선순위에 따라 전략 추가 (높은 우선순위부터)
+        # 백업 전략은 탐침용 연결 풀을 갖고 있어 close()에서 함께 닫습니다
+        self._fallback_strategy = FallbackStrategy()
+        self._strategy_context = FTPDirectoryContext()
+        self._strategy_context.add_strategy(MLSDStrategy())    # 가장 효율적
+        self._strategy_context.add_strategy(DIRStrategy())     # 중간 효율성
+        self._strategy_context.add_strategy(self._fallback_strategy) # 가장 느리지만 호환성 높음
+        self._selected_strategy: Optional[FTPDirectoryStrategy] = None
+
+    def __enter__(self) -> "FTPScout":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _select_strategy(self, start_path: str) -> Optional[FTPDirectoryStrategy]:
+        """최적의 전략을 선택합니다 (인스턴스 수명 동안 한 번만).
+
+        이전 실행에서 성공한 전략이 있으면 탐색 왕복을 생략하고 바로
+        재사용합니다. 없으면 우선순위대로 자동 탐색합니다.
+        """
+        if self._selected_strategy is not None:
+            return self._selected_strategy
+
+        cached_name = load_cached_strategy(self.host)
+        if cached_name:
+            selected = self._strategy_context.set_strategy_by_name(cached_name)
+            if selected is not None:
+                print(f"캐시된 {cached_name} 전략을 재사용합니다.")
+                self._selected_strategy = selected
+                return selected
+
+        # 자동 탐색은 CWD 기준의 백업 전략까지 시도할 수 있으므로
+        # 시작 경로로 이동해 둡니다. 캐시된 전략을 쓸 때는 불필요한
+        # 왕복이므로 생략합니다 (CWD 기준 전략이면 순회 루프가 수행).
+        self._conn.cwd(start_path)
+        selected = self._strategy_context.auto_select_strategy(self._conn, start_path)
+        if selected is not None:
+            save_cached_strategy(self.host, selected.get_strategy_name())
+            self._selected_strategy = selected
+        return selected
+
+    def _ensure_extra_connections(self) -> None:
+        """요청한 연결 수만큼 보조 연결을 준비합니다 (한 번만 시도).
+
+        서버가 동시 로그인을 제한하면(421/530 등) 만들어진 만큼만 사용하고,
+        하나도 못 만들면 기본 연결로 순차 순회합니다.
+        """
+        if self._extra_conns_ready:
+            return
+        self._extra_conns_ready = True
+        for _ in range(self.connections - 1):
+            try:
+                self._extra_conns.append(
+                    RobustFTPConnection(
+                        self.host, self.username, self.password,
+                        use_tls=self.use_tls,
+                    )
+                )
+            except Exception as e:
+                logger.warning("보조 연결 생성 실패, %d개 연결로 동작: %s",
+                               len(self._extra_conns) + 1, e)
+                break
+
+    def walk(
+        self, remote_start_path: str = "/"
+    ) -> Generator[Tuple[str, bool], None, None]:
+        """시작 경로 아래를 재귀 순회하며 (경로, is_directory)를 생성합니다.
+
+        디렉토리 경로는 "/"로 끝납니다. connections > 1이면 연결 수만큼
+        워커를 띄워 디렉토리를 병렬로 조회하며, 소비자보다 최대 prefetch
+        개의 디렉토리 목록만큼 앞서 가져옵니다. 항목 순서는 보장하지
+        않습니다. 연결이 끊어지면 자동으로 재연결합니다.
+        MLSD -> DIR -> 백업 방식 순으로 시도합니다.
+        """
+        # 시작 경로를 정규화합니다
+        normalized_start_path = remote_start_path.rstrip("/") + "/"
+
+        selected_strategy = self._select_strategy(normalized_start_path)
+        if selected_strategy is None:
+            print("모든 전략이 실패했습니다.")
+            return
+
+        # MLSD/LIST는 절대 경로 인자를 받으므로 CWD 왕복이 필요 없습니다.
+        needs_cwd = selected_strategy.requires_cwd()
+
+        self._ensure_extra_connections()
+        if self._extra_conns:
+            listings = _walk_listings_parallel(
+                [self._conn] + self._extra_conns,
+                self._strategy_context,
+                self.host,
+                normalized_start_path,
+                needs_cwd,
+                self.prefetch,
+            )
+        else:
+            listings = _walk_listings(
+                self._conn,
+                self._strategy_context,
+                self.host,
+                normalized_start_path,
+                needs_cwd,
+            )
+
+        # 시작 경로 접두어는 순회 내내 불변이므로 지역 변수로 고정합니다.
+        prefix = normalized_start_path
+
+        for current_ftp_dir, current_relative_path, contents in listings:
+            # 디렉토리 안 모든 항목이 같은 접두 경로를 공유하므로 디렉토리당
+            # 한 번만 이어붙이고, 항목당 연결은 한 번으로 줄입니다.
+            # FTP 경로는 항상 POSIX 스타일이고 접두 경로는 모두 ""이거나
+            # "/"로 끝나므로 os.path.join 대신 단순 이어붙이기로 충분합니다.
+            base_path = prefix + current_relative_path
+
+            for item_name, is_directory in contents:
+                if is_directory:
+                    # 디렉토리
+                    yield base_path + item_name + "/", True
+                else:
+                    # 파일
+                    yield base_path + item_name, False
+
+    def close(self) -> None:
+        """보유한 모든 FTP 연결(탐침 풀 포함)을 종료합니다.
+
+        닫기 전에 abort()로 각 연결의 진행 중인 백오프 대기를 풀어
+        종료가 재시도 지연(최대 30초)에 붙잡히지 않게 합니다.
+        """
+        self._conn.abort()
+        for conn in self._extra_conns:
+            conn.abort()
+        self._fallback_strategy.close()
+        for conn in self._extra_conns:
+            conn.close()
+        self._extra_conns = []
+        self._extra_conns_ready = False
+        self._conn.close()
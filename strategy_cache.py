@@ -0,0 +1,52 @@
+import json
+import os
+from typing import Dict, Optional
+
+# 호스트별로 성공한 전략 이름을 저장해 두고 다음 실행에서 탐색 왕복을
+# 생략합니다. 캐시 파일을 읽거나 쓸 수 없어도 동작에는 지장이 없도록
+# 모든 입출력 오류는 조용히 무시합니다 (최선 노력 캐시).
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ftp-scout")
+CACHE_FILE = os.path.join(CACHE_DIR, "strategies.json")
+
+
+def _load_all() -> Dict[str, str]:
+    """캐시 파일 전체를 읽습니다. 없거나 손상되었으면 빈 딕셔너리."""
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return data
+    except Exception:
+        pass
+    return {}
+
+
+def _save_all(data: Dict[str, str]) -> None:
+    """캐시 파일 전체를 기록합니다."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except Exception:
+        pass
+
+
+def load_cached_strategy(host: str) -> Optional[str]:
+    """호스트에 대해 이전에 성공한 전략 이름을 반환합니다. 없으면 None."""
+    return _load_all().get(host)
+
+
+def save_cached_strategy(host: str, strategy_name: str) -> None:
+    """호스트에 대해 선택된 전략 이름을 저장합니다."""
+    data = _load_all()
+    if data.get(host) != strategy_name:
+        data[host] = strategy_name
+        _save_all(data)
+
+
+def invalidate_cached_strategy(host: str) -> None:
+    """호스트의 캐시 항목을 제거합니다 (전략이 순회 중 실패한 경우)."""
+    data = _load_all()
+    if host in data:
+        del data[host]
+        _save_all(data)